@@ -17,8 +17,10 @@ Usage:
 
 import asyncio
 import json
+import os
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import argparse
@@ -26,6 +28,56 @@ import argparse
 from telethon import TelegramClient
 from telethon.tl.types import PeerUser, PeerChat, PeerChannel
 
+try:
+    import orjson  # Optional C serializer, several times faster than stdlib json
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # Optional drop-in event loop with lower per-await overhead
+except ImportError:
+    uvloop = None
+
+
+def dumps(obj, indent: bool = True) -> str:
+    """Serialize to JSON for output, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, ensure_ascii=False)
+
+
+# How long cached account info stays valid (it rarely changes).
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Unix socket used by --daemon so short-lived CLI calls can reuse one
+# already-connected TelegramClient instead of paying session startup.
+DAEMON_SOCKET_PATH = os.getenv("TG_DAEMON_SOCKET", "/tmp/tg-assistant.sock")
+
+# Date-bounded scrapes fetch pages of this size, with several pages in
+# flight per round trip so page latency overlaps.
+SCRAPE_PAGE_SIZE = 100
+SCRAPE_PIPELINE_DEPTH = int(os.getenv("TG_SCRAPE_PIPELINE", "4"))
+
+# Flush the scrape checkpoint file to disk every this many messages.
+CHECKPOINT_EVERY = 1000
+
+# Media type -> display name, so the result-building loop resolves each
+# Telethon media class's name once instead of per message.
+_MEDIA_NAME: Dict[type, str] = {}
+
+
+def _media_name(media) -> Optional[str]:
+    """Return the class name of a message's media, or None."""
+    if media is None:
+        return None
+    media_type = type(media)
+    name = _MEDIA_NAME.get(media_type)
+    if name is None:
+        name = _MEDIA_NAME.setdefault(media_type, media_type.__name__)
+    return name
+
 
 class TelegramSearchClient:
     def __init__(self, api_id: int, api_hash: str, session_name: str = "anon"):
@@ -33,14 +85,37 @@ class TelegramSearchClient:
         self.api_hash = api_hash
         self.session_name = session_name
         self.client = None
+        # Small on-disk cache for values that survive invocations (e.g. "me"),
+        # so short runs skip the RPCs that re-fetch them every time.
+        self._cache_path = Path(f"{session_name}.cache.json")
+        self._cache: Dict[str, Any] = {}
+        self._cache_dirty = False
+        # Per-run cache of resolved input entities: repeated lookups of the
+        # same chat cost at most one RPC. asyncio is single-threaded, so no
+        # lock is needed; a duplicate in-flight miss is still correct.
+        self._entity_cache: Dict[Any, Any] = {}
+
+    async def _entity(self, chat_id):
+        """Resolve a chat id (or 'me') to an input entity, cached per run."""
+        entity = self._entity_cache.get(chat_id)
+        if entity is None:
+            entity = await self.client.get_input_entity(chat_id)
+            self._entity_cache[chat_id] = entity
+        return entity
 
     async def connect(self):
         """Connect to Telegram. If session doesn't exist, prompt for login."""
         self.client = TelegramClient(self.session_name, self.api_id, self.api_hash)
-        
+
+        # Load the persistent cache (missing or corrupt files start empty)
+        try:
+            self._cache = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            self._cache = {}
+
         # Check if session file exists
         session_file = Path(f"{self.session_name}.session")
-        
+
         if not session_file.exists():
             print("[INFO] No existing session found. Starting authentication...")
             await self.client.start()
@@ -50,107 +125,267 @@ class TelegramSearchClient:
             await self.client.start()
 
     async def disconnect(self):
-        """Disconnect from Telegram."""
+        """Disconnect from Telegram and persist the cache if it changed."""
+        if self._cache_dirty:
+            try:
+                self._cache_path.write_text(json.dumps(self._cache))
+            except OSError:
+                pass
         if self.client:
             await self.client.disconnect()
 
-    async def search_global(self, query: str, chat_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def iter_search(self, query: str, chat_id: Optional[int] = None):
         """
-        Search for messages containing query text.
-        
+        Search for messages containing query text, yielding matches as they
+        arrive so callers can stream them instead of buffering.
+
         Args:
             query: Search keyword(s)
             chat_id: Optional specific chat ID. If None, search all dialogs.
-        
-        Returns:
-            List of matching messages with context.
+
+        Yields:
+            Dicts describing matching messages with context.
+
+        Raises:
+            ValueError: If chat_id cannot be resolved to a known chat.
         """
-        results = []
-        
         if chat_id:
-            # Search in specific chat
-            dialogs = [dialog for dialog in await self.client.get_dialogs() if dialog.id == chat_id]
-            if not dialogs:
-                return {"error": f"Chat ID {chat_id} not found", "results": []}
-        else:
-            # Search all dialogs
-            dialogs = await self.client.get_dialogs()
-        
-        for dialog in dialogs:
-            chat_title = dialog.title or f"Chat {dialog.id}"
-            chat_id_val = dialog.id
-            
+            # Search in specific chat. Resolve the peer directly instead of
+            # downloading and scanning the whole dialog list.
+            entity = await self._entity(chat_id)
+
             try:
-                # Search messages in this dialog
-                async for message in self.client.iter_messages(dialog.entity, search=query, limit=100):
-                    if message and message.text:
-                        results.append({
-                            "chat_id": chat_id_val,
-                            "chat_title": chat_title,
-                            "message_id": message.id,
-                            "text": message.text[:500],  # First 500 chars
-                            "date": message.date.isoformat() if message.date else None,
-                            "sender_id": message.sender_id,
-                        })
+                async for message in self.client.iter_messages(entity, search=query, limit=100):
+                    # Filter on the raw string field before doing any other
+                    # work; message.text is a property that may re-render
+                    # formatting on every access.
+                    txt = getattr(message, "message", None)
+                    if not txt:
+                        continue
+
+                    chat = message.chat
+                    chat_title = (
+                        getattr(chat, "title", None)
+                        or getattr(chat, "first_name", None)
+                        or f"Chat {chat_id}"
+                    )
+                    yield {
+                        "chat_id": chat_id,
+                        "chat_title": chat_title,
+                        "message_id": message.id,
+                        "text": txt[:500],  # First 500 chars
+                        "date": message.date.isoformat() if message.date else None,
+                        "sender_id": message.sender_id,
+                    }
             except Exception as e:
                 # Skip chats we can't access
                 pass
-        
+        else:
+            # Server-side global search (messages.SearchGlobal): one request
+            # instead of one iter_messages round trip per dialog.
+            async for message in self.client.iter_messages(None, search=query, limit=100):
+                # Same raw-field pre-filter as above; global search returns
+                # plenty of media-only messages worth skipping cheaply.
+                txt = getattr(message, "message", None)
+                if not txt:
+                    continue
+
+                chat = message.chat
+                chat_title = (
+                    getattr(chat, "title", None)
+                    or getattr(chat, "first_name", None)
+                    or f"Chat {message.chat_id}"
+                )
+                yield {
+                    "chat_id": message.chat_id,
+                    "chat_title": chat_title,
+                    "message_id": message.id,
+                    "text": txt[:500],  # First 500 chars
+                    "date": message.date.isoformat() if message.date else None,
+                    "sender_id": message.sender_id,
+                }
+
+    async def search_global(self, query: str, chat_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Search for messages containing query text.
+
+        Args:
+            query: Search keyword(s)
+            chat_id: Optional specific chat ID. If None, search all dialogs.
+
+        Returns:
+            Dict with all matching messages, for single-document output.
+        """
+        try:
+            results = [result async for result in self.iter_search(query, chat_id)]
+        except ValueError:
+            return {"error": f"Chat ID {chat_id} not found", "results": []}
+
         return {"query": query, "results": results, "total": len(results)}
 
-    async def scrape_saved_messages(self, target_date: str) -> Dict[str, Any]:
+    async def _resolve_date_bounds(self, peer, start_utc, end_utc):
+        """
+        Translate a date window into exclusive message-id bounds
+        (min_id, max_id) with two anchor lookups, so pages inside the
+        window can then be requested by id, several at a time.
+
+        Returns (None, None) when the window contains no messages.
+        """
+        newest, oldest = await gather_batch(
+            self.client.get_messages(peer, limit=1, offset_date=end_utc + timedelta(seconds=1)),
+            self.client.get_messages(peer, limit=1, offset_date=start_utc),
+        )
+        if not newest:
+            return None, None
+
+        max_id = newest[0].id + 1  # max_id is exclusive; keep the anchor itself
+        min_id = oldest[0].id if oldest else 0  # min_id is exclusive
+        if max_id <= min_id + 1:
+            return None, None
+        return min_id, max_id
+
+    async def iter_saved_messages(self, target_date: str, resume_from: Optional[int] = None):
+        """
+        Scrape "Saved Messages" for a specific date, yielding messages as
+        they arrive so callers can stream them instead of buffering.
+
+        Results are also checkpointed to scrape_<date>.partial.ndjson as
+        they arrive (flushed every CHECKPOINT_EVERY messages) and the file
+        is renamed to scrape_<date>.ndjson once the day completes, so an
+        interrupted run keeps its progress.
+
+        Args:
+            target_date: Date in format YYYY-MM-DD
+            resume_from: Only fetch messages with an id below this one,
+                e.g. the last message id of an interrupted run.
+
+        Yields:
+            Dicts describing messages from that date, newest first.
+
+        Raises:
+            ValueError: If target_date is not in YYYY-MM-DD format.
+        """
+        # Parse target date
+        date_obj = datetime.strptime(target_date, "%Y-%m-%d")
+        start_of_day = date_obj.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = date_obj.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+        # Telethon expects UTC-aware datetimes for date offsets, and
+        # tz-aware bounds also compare directly against message.date
+        # without a per-message naive conversion.
+        start_utc = start_of_day.replace(tzinfo=timezone.utc)
+        end_utc = end_of_day.replace(tzinfo=timezone.utc)
+
+        # Warm the account-info cache and resolve the Saved Messages peer
+        # concurrently -- the two lookups are independent, so neither waits
+        # on the other's round trip.
+        _, saved_peer = await gather_batch(
+            self.get_me(),
+            self._entity("me"),
+        )
+
+        min_id, max_id = await self._resolve_date_bounds(saved_peer, start_utc, end_utc)
+
+        checkpoint_path = Path(f"scrape_{target_date}.partial.ndjson")
+        final_path = Path(f"scrape_{target_date}.ndjson")
+
+        if max_id is None:
+            if resume_from:
+                # A resumed run whose remaining window is empty still owns
+                # the partial file from the interrupted run; finalize it
+                # instead of stranding it forever.
+                checkpoint_path.open("a", encoding="utf-8").close()
+                checkpoint_path.rename(final_path)
+            return
+
+        if resume_from:
+            # Continue below the last message an interrupted run reached.
+            max_id = min(max_id, resume_from)
+
+        checkpoint = checkpoint_path.open("a" if resume_from else "w", encoding="utf-8")
+        count = 0
+        completed = False
+
+        try:
+            # Page through the id window with several requests in flight per
+            # round trip, instead of letting iter_messages await each
+            # 100-message page serially. add_offset partitions the pages by
+            # position below max_id, so they never overlap.
+            while max_id > min_id + 1:
+                pages = await gather_batch(*(
+                    self.client.get_messages(
+                        saved_peer,
+                        limit=SCRAPE_PAGE_SIZE,
+                        max_id=max_id,
+                        min_id=min_id,
+                        add_offset=depth * SCRAPE_PAGE_SIZE,
+                    )
+                    for depth in range(SCRAPE_PIPELINE_DEPTH)
+                ))
+
+                fetched = 0
+                last_id = None
+                for page in pages:
+                    for message in page:
+                        fetched += 1
+                        last_id = message.id
+                        if message and message.date:
+                            # Check if message is within target date
+                            if start_utc <= message.date <= end_utc:
+                                result = {
+                                    "message_id": message.id,
+                                    "text": message.text or "",
+                                    "date": message.date.isoformat(),
+                                    "is_read": not message.out,  # Rough heuristic
+                                    "media_type": _media_name(message.media),
+                                }
+                                checkpoint.write(dumps(result, indent=False) + "\n")
+                                count += 1
+                                if count % CHECKPOINT_EVERY == 0:
+                                    checkpoint.flush()
+                                    os.fsync(checkpoint.fileno())
+                                yield result
+
+                # A short round means the window (or history) is exhausted.
+                if last_id is None or fetched < SCRAPE_PAGE_SIZE * SCRAPE_PIPELINE_DEPTH:
+                    break
+                max_id = last_id
+
+            completed = True
+        finally:
+            checkpoint.close()
+            if completed:
+                # Keep only the finished file; the .partial suffix marks
+                # runs that were interrupted and can be resumed.
+                checkpoint_path.rename(final_path)
+
+    async def scrape_saved_messages(self, target_date: str, resume_from: Optional[int] = None) -> Dict[str, Any]:
         """
         Scrape "Saved Messages" for a specific date.
         Retrieves all messages from that date, even if read.
-        
+
         Args:
             target_date: Date in format YYYY-MM-DD
-        
+            resume_from: Optional message id to resume an interrupted run below.
+
         Returns:
             Dict with messages from that date
         """
+        results = []
         try:
-            # Parse target date
-            date_obj = datetime.strptime(target_date, "%Y-%m-%d")
-            start_of_day = date_obj.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = date_obj.replace(hour=23, minute=59, second=59, microsecond=999999)
+            async for result in self.iter_saved_messages(target_date, resume_from):
+                results.append(result)
         except ValueError:
             return {
                 "error": "Invalid date format. Use YYYY-MM-DD",
                 "results": []
             }
-        
-        # Get current user (Saved Messages is typically the user's own chat)
-        me = await self.client.get_me()
-        saved_messages_id = me.id
-        
-        results = []
-        
-        try:
-            # Fetch messages from Saved Messages
-            async for message in self.client.iter_messages(saved_messages_id, limit=None):
-                if message and message.date:
-                    msg_date = message.date.replace(tzinfo=None)
-                    
-                    # Check if message is within target date
-                    if start_of_day <= msg_date <= end_of_day:
-                        results.append({
-                            "message_id": message.id,
-                            "text": message.text or "",
-                            "date": message.date.isoformat(),
-                            "is_read": not message.out,  # Rough heuristic
-                            "media_type": message.media.__class__.__name__ if message.media else None,
-                        })
-                    
-                    # Stop if we've passed the target date (older messages)
-                    if msg_date < start_of_day:
-                        break
         except Exception as e:
             return {
                 "error": f"Failed to scrape Saved Messages: {str(e)}",
                 "results": []
             }
-        
+
         return {
             "date": target_date,
             "results": results,
@@ -158,15 +393,90 @@ class TelegramSearchClient:
         }
 
     async def get_me(self) -> Dict[str, Any]:
-        """Get current user info."""
+        """Get current user info, served from the on-disk cache when fresh."""
+        cached = self._cache.get("me")
+        if cached and time.time() - cached.get("cached_at", 0) < CACHE_TTL_SECONDS:
+            return {k: v for k, v in cached.items() if k != "cached_at"}
+
         me = await self.client.get_me()
-        return {
+        info = {
             "user_id": me.id,
             "first_name": me.first_name,
             "last_name": me.last_name,
             "username": me.username,
             "phone": me.phone,
         }
+        self._cache["me"] = dict(info, cached_at=time.time())
+        self._cache_dirty = True
+        return info
+
+
+async def gather_batch(*awaitables):
+    """Run independent awaitables concurrently and return their results."""
+    return await asyncio.gather(*awaitables)
+
+
+async def run_daemon(client: TelegramSearchClient):
+    """
+    Serve search/scrape/whoami requests over a local Unix socket.
+
+    Holds one connected TelegramClient open so each CLI invocation skips
+    the TCP+TLS+MTProto handshake and SQLite session-file contention.
+    Protocol: one JSON request per connection, one JSON response back.
+    """
+    async def handle(reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            op = request.get("op")
+            if op == "search":
+                response = await client.search_global(request.get("query"), request.get("chat_id"))
+            elif op == "scrape":
+                response = await client.scrape_saved_messages(request.get("date"), request.get("resume_from"))
+            elif op == "whoami":
+                response = await client.get_me()
+            else:
+                response = {"error": f"Unknown operation: {op}"}
+        except Exception as e:
+            response = {"error": str(e), "error_type": type(e).__name__}
+
+        writer.write(dumps(response, indent=False).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+
+    socket_path = Path(DAEMON_SOCKET_PATH)
+    if socket_path.exists():
+        # Stale socket from a previous daemon
+        socket_path.unlink()
+
+    server = await asyncio.start_unix_server(handle, path=DAEMON_SOCKET_PATH)
+    print(f"[INFO] Daemon listening on {DAEMON_SOCKET_PATH}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+async def forward_to_daemon(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request to the running daemon and return its response."""
+    reader, writer = await asyncio.open_unix_connection(DAEMON_SOCKET_PATH)
+    writer.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+
+async def stream_ndjson(items):
+    """Write one JSON object per line as results arrive."""
+    count = 0
+    async for item in items:
+        sys.stdout.write(dumps(item, indent=False) + "\n")
+        count += 1
+        if count % 50 == 0:
+            sys.stdout.flush()
+    sys.stdout.flush()
 
 
 async def main():
@@ -180,6 +490,7 @@ Examples:
   python telegram_client.py --search "keyword" --chat-id 123456
   python telegram_client.py --scrape-saved 2024-01-15
   python telegram_client.py --whoami
+  python telegram_client.py --daemon
         """
     )
     
@@ -187,14 +498,43 @@ Examples:
     parser.add_argument("--search", type=str, help="Search all chats for keyword(s)")
     parser.add_argument("--chat-id", type=int, help="Limit search to specific chat ID")
     parser.add_argument("--scrape-saved", type=str, help="Scrape Saved Messages by date (YYYY-MM-DD)")
+    parser.add_argument("--ndjson", action="store_true", help="Stream results as newline-delimited JSON instead of one document")
+    parser.add_argument("--resume-from", type=int, help="Resume an interrupted scrape below this message id")
     parser.add_argument("--whoami", action="store_true", help="Display current user info")
+    parser.add_argument("--daemon", action="store_true", help="Run as a local daemon holding one open connection")
     parser.add_argument("--api-id", type=int, help="Telegram API ID (or set TELEGRAM_API_ID env var)")
     parser.add_argument("--api-hash", type=str, help="Telegram API Hash (or set TELEGRAM_API_HASH env var)")
     
     args = parser.parse_args()
-    
+
+    # If a daemon already holds an open connection, forward the request to
+    # it and skip session startup entirely. --ndjson streams results as
+    # they arrive, which the one-document daemon protocol cannot do, so
+    # those runs always connect directly.
+    if not args.daemon and not args.auth and not args.ndjson and Path(DAEMON_SOCKET_PATH).exists():
+        request = None
+        if args.search:
+            request = {"op": "search", "query": args.search, "chat_id": args.chat_id}
+        elif args.scrape_saved:
+            request = {"op": "scrape", "date": args.scrape_saved, "resume_from": args.resume_from}
+        elif args.whoami:
+            request = {"op": "whoami"}
+
+        if request:
+            try:
+                response = await forward_to_daemon(request)
+            except (ConnectionRefusedError, OSError):
+                # Stale socket left by a crashed daemon: remove it and fall
+                # through to the normal direct-connection path.
+                try:
+                    Path(DAEMON_SOCKET_PATH).unlink()
+                except OSError:
+                    pass
+            else:
+                print(dumps(response))
+                return
+
     # Get API credentials from args or environment
-    import os
     api_id = args.api_id or os.getenv("TELEGRAM_API_ID")
     api_hash = args.api_hash or os.getenv("TELEGRAM_API_HASH")
     
@@ -214,26 +554,35 @@ Examples:
     try:
         await client.connect()
         
-        if args.auth:
+        if args.daemon:
+            await run_daemon(client)
+
+        elif args.auth:
             # Just authenticate
             me = await client.get_me()
-            print(json.dumps({
+            print(dumps({
                 "status": "authenticated",
                 "user": me,
                 "session_file": f"{client.session_name}.session"
-            }, indent=2, ensure_ascii=False))
+            }))
         
         elif args.whoami:
             me = await client.get_me()
-            print(json.dumps(me, indent=2, ensure_ascii=False))
+            print(dumps(me))
         
         elif args.search:
-            results = await client.search_global(args.search, args.chat_id)
-            print(json.dumps(results, indent=2, ensure_ascii=False))
-        
+            if args.ndjson:
+                await stream_ndjson(client.iter_search(args.search, args.chat_id))
+            else:
+                results = await client.search_global(args.search, args.chat_id)
+                print(dumps(results))
+
         elif args.scrape_saved:
-            results = await client.scrape_saved_messages(args.scrape_saved)
-            print(json.dumps(results, indent=2, ensure_ascii=False))
+            if args.ndjson:
+                await stream_ndjson(client.iter_saved_messages(args.scrape_saved, args.resume_from))
+            else:
+                results = await client.scrape_saved_messages(args.scrape_saved, args.resume_from)
+                print(dumps(results))
         
         else:
             parser.print_help()
@@ -242,15 +591,17 @@ Examples:
         print("\n[INFO] Interrupted by user")
         sys.exit(0)
     except Exception as e:
-        print(json.dumps({
+        print(dumps({
             "error": str(e),
             "error_type": type(e).__name__
-        }, indent=2))
+        }))
         sys.exit(1)
     finally:
         await client.disconnect()
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())
 